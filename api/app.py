@@ -1,58 +1,102 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
 
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import ORJSONResponse
+
+from bot.cache import RedisCache
 from bot.services.analytics import AnalyticsService
 from bot.services.security import SecurityService
 from bot.utils.premium import PremiumRequiredError
 
+log = logging.getLogger(__name__)
+
+RESPONSE_CACHE_TTL_SECONDS = 10
+RESPONSE_CACHE_MAX_STALE_SECONDS = 300
+
+
+
+def _json(raw: bytes | str) -> Response:
+    return Response(content=raw, media_type="application/json")
 
 
-def create_api(analytics: AnalyticsService, security: SecurityService) -> FastAPI:
-    app = FastAPI(title="Discord Invite Security Bot API", version="1.0.0")
+
+def create_api(analytics: AnalyticsService, security: SecurityService, cache: RedisCache) -> FastAPI:
+    app = FastAPI(
+        title="Discord Invite Security Bot API",
+        version="1.0.0",
+        default_response_class=ORJSONResponse,
+    )
+    refresh_tasks: set[asyncio.Task] = set()
+
+    async def refresh(key: str, produce: Callable[[], Awaitable[str]]) -> str:
+        raw = await produce()
+        await cache.set_raw(key, raw, ex=RESPONSE_CACHE_MAX_STALE_SECONDS)
+        return raw
+
+    async def refresh_in_background(key: str, produce: Callable[[], Awaitable[str]]) -> None:
+        try:
+            await refresh(key, produce)
+        except Exception:
+            log.exception("Failed refreshing cached response key=%s", key)
+
+    async def cached_json(key: str, produce: Callable[[], Awaitable[str]]) -> Response:
+        # Stale-while-revalidate: the payload outlives the freshness marker, and
+        # whichever request re-claims the marker refreshes it in the background.
+        raw, claimed = await cache.get_raw_and_claim(key, f"{key}:fresh", ex=RESPONSE_CACHE_TTL_SECONDS)
+        if raw is None:
+            raw = await refresh(key, produce)
+        elif claimed:
+            task = asyncio.create_task(refresh_in_background(key, produce))
+            refresh_tasks.add(task)
+            task.add_done_callback(refresh_tasks.discard)
+        return _json(raw)
 
     @app.get("/health")
     async def health() -> dict:
         return {"ok": True}
 
     @app.get("/api/guild/{guild_id}/overview")
-    async def guild_overview(guild_id: int) -> dict:
+    async def guild_overview(guild_id: int) -> Response:
         data = await analytics.guild_overview(guild_id)
         if not data:
             raise HTTPException(status_code=404, detail="Guild not found")
-        return data
+        return _json(data)
 
     @app.get("/api/guild/{guild_id}/invites")
-    async def guild_invites(guild_id: int) -> list[dict]:
-        return await analytics.guild_invites(guild_id)
+    async def guild_invites(guild_id: int) -> Response:
+        return _json(await analytics.guild_invites(guild_id))
 
     @app.get("/api/guild/{guild_id}/security")
-    async def guild_security(guild_id: int) -> dict:
-        return await analytics.guild_security(guild_id)
+    async def guild_security(guild_id: int) -> Response:
+        return _json(await analytics.guild_security(guild_id))
 
     @app.get("/api/leaderboard")
-    async def leaderboard(limit: int = 25) -> list[dict]:
+    async def leaderboard(limit: int = 25) -> Response:
         bounded = max(1, min(limit, 100))
-        return await analytics.leaderboard(limit=bounded)
+        return await cached_json(f"api:leaderboard:{bounded}", lambda: analytics.leaderboard(limit=bounded))
 
     @app.get("/api/incidents")
-    async def incidents(limit: int = 100) -> list[dict]:
+    async def incidents(limit: int = 100) -> Response:
         bounded = max(1, min(limit, 500))
-        return await analytics.incidents(limit=bounded)
+        return await cached_json(f"api:incidents:{bounded}", lambda: analytics.incidents(limit=bounded))
 
     @app.get("/api/guild/{guild_id}/security/analytics")
-    async def security_analytics(guild_id: int) -> dict:
+    async def security_analytics(guild_id: int) -> Response:
         try:
-            return await analytics.security_analytics(guild_id)
+            return _json(await analytics.security_analytics(guild_id))
         except PremiumRequiredError as exc:
             raise HTTPException(status_code=403, detail=str(exc)) from exc
 
     @app.get("/api/guild/{guild_id}/fraud-scores")
-    async def fraud_scores(guild_id: int) -> list[dict]:
+    async def fraud_scores(guild_id: int) -> Response:
         try:
-            rows = await security.invite_fraud_scoring(guild_id)
+            raw = await security.invite_fraud_scoring(guild_id)
         except PremiumRequiredError as exc:
             raise HTTPException(status_code=403, detail=str(exc)) from exc
-        return [dict(r) for r in rows]
+        return _json(raw)
 
     return app
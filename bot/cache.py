@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-import json
 from typing import Any
 
 import redis.asyncio as redis
 
+from bot.utils.serialization import dumps, loads
+
 
 class RedisCache:
     def __init__(self, url: str) -> None:
@@ -12,7 +13,7 @@ class RedisCache:
         self.client: redis.Redis | None = None
 
     async def connect(self) -> None:
-        self.client = redis.from_url(self._url, decode_responses=True)
+        self.client = redis.from_url(self._url, decode_responses=False)
         await self.client.ping()
 
     async def close(self) -> None:
@@ -25,11 +26,65 @@ class RedisCache:
         return self.client
 
     async def set_json(self, key: str, value: Any, ex: int | None = None) -> None:
-        payload = json.dumps(value)
+        payload = dumps(value)
         await self.require_client().set(key, payload, ex=ex)
 
     async def get_json(self, key: str) -> Any | None:
         raw = await self.require_client().get(key)
         if raw is None:
             return None
-        return json.loads(raw)
+        return loads(raw)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.require_client().delete(*keys)
+
+    async def set_raw(self, key: str, payload: bytes | str, ex: int | None = None) -> None:
+        await self.require_client().set(key, payload, ex=ex)
+
+    async def get_raw_and_claim(self, key: str, claim_key: str, ex: int) -> tuple[bytes | None, bool]:
+        """Read ``key`` and try to take ``claim_key`` (SET NX) in one round trip."""
+        async with self.require_client().pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.set(claim_key, 1, nx=True, ex=ex)
+            raw, claimed = await pipe.execute()
+        return raw, bool(claimed)
+
+    async def hgetall(self, key: str) -> dict[bytes, bytes]:
+        return await self.require_client().hgetall(key)
+
+    async def hset(self, key: str, field: str, value: bytes) -> None:
+        await self.require_client().hset(key, field, value)
+
+    async def hdel(self, key: str, *fields: str) -> None:
+        if fields:
+            await self.require_client().hdel(key, *fields)
+
+    async def hmget(self, key: str, fields: list[str]) -> list[bytes | None]:
+        if not fields:
+            return []
+        return await self.require_client().hmget(key, fields)
+
+    async def update_hash(self, key: str, changed: dict[str, bytes], removed: list[str]) -> None:
+        """Set ``changed`` fields and delete ``removed`` ones in one transaction."""
+        if not changed and not removed:
+            return
+        async with self.require_client().pipeline(transaction=True) as pipe:
+            if changed:
+                pipe.hset(key, mapping=changed)
+            if removed:
+                pipe.hdel(key, *removed)
+            await pipe.execute()
+
+    async def replace_hashes(self, mapping: dict[str, dict[str, bytes | int]], ex: int | None = None) -> None:
+        """Atomically overwrite each hash in ``mapping`` with the given fields."""
+        if not mapping:
+            return
+        async with self.require_client().pipeline(transaction=True) as pipe:
+            for key, fields in mapping.items():
+                pipe.delete(key)
+                if fields:
+                    pipe.hset(key, mapping=fields)
+                    if ex is not None:
+                        pipe.expire(key, ex)
+            await pipe.execute()
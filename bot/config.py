@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
+from functools import lru_cache
 
+import msgspec
 
-@dataclass(frozen=True)
-class Settings:
+
+class Settings(msgspec.Struct, frozen=True):
     discord_token: str
     application_id: int
     postgres_dsn: str
@@ -22,6 +23,11 @@ class Settings:
     api_host: str
     api_port: int
     security_timeout_minutes: int
+    snapshot_rebuild_concurrency: int
+    db_pool_min_size: int
+    db_pool_max_size: int
+    db_pool_max_queries: int
+    db_pool_max_inactive_lifetime_seconds: float
 
 
 
@@ -32,6 +38,7 @@ def _as_bool(value: str | None, default: bool) -> bool:
 
 
 
+@lru_cache(maxsize=1)
 def load_settings() -> Settings:
     token = os.getenv("DISCORD_TOKEN", "").strip()
     app_id = os.getenv("DISCORD_APPLICATION_ID", "").strip()
@@ -65,4 +72,9 @@ def load_settings() -> Settings:
         api_host=os.getenv("API_HOST", "0.0.0.0"),
         api_port=int(os.getenv("API_PORT", "8080")),
         security_timeout_minutes=int(os.getenv("SECURITY_TIMEOUT_MINUTES", "30")),
+        snapshot_rebuild_concurrency=max(1, int(os.getenv("SNAPSHOT_REBUILD_CONCURRENCY", "10"))),
+        db_pool_min_size=int(os.getenv("DB_POOL_MIN_SIZE", "10")),
+        db_pool_max_size=int(os.getenv("DB_POOL_MAX_SIZE", "50")),
+        db_pool_max_queries=int(os.getenv("DB_POOL_MAX_QUERIES", "50000")),
+        db_pool_max_inactive_lifetime_seconds=float(os.getenv("DB_POOL_MAX_INACTIVE_LIFETIME_SECONDS", "600")),
     )
@@ -1,15 +1,64 @@
 from __future__ import annotations
 
+from typing import Any
+
 import asyncpg
 
+from bot.utils.serialization import dumps, loads
+
+_JSONB_BINARY_VERSION = b"\x01"
+
+
+
+def _encode_jsonb(value: Any) -> bytes:
+    return _JSONB_BINARY_VERSION + dumps(value)
+
+
+
+def _decode_jsonb(data: bytes) -> Any:
+    return loads(data[1:])
+
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    await conn.set_type_codec(
+        "jsonb",
+        encoder=_encode_jsonb,
+        decoder=_decode_jsonb,
+        schema="pg_catalog",
+        format="binary",
+    )
+
 
 class Database:
-    def __init__(self, dsn: str) -> None:
+    def __init__(
+        self,
+        dsn: str,
+        *,
+        min_size: int = 10,
+        max_size: int = 50,
+        max_queries: int = 50_000,
+        max_inactive_connection_lifetime: float = 600.0,
+    ) -> None:
         self._dsn = dsn
+        self._min_size = min_size
+        self._max_size = max_size
+        self._max_queries = max_queries
+        self._max_inactive_connection_lifetime = max_inactive_connection_lifetime
         self.pool: asyncpg.Pool | None = None
 
     async def connect(self) -> None:
-        self.pool = await asyncpg.create_pool(self._dsn, min_size=3, max_size=20)
+        self.pool = await asyncpg.create_pool(
+            self._dsn,
+            min_size=self._min_size,
+            max_size=self._max_size,
+            max_queries=self._max_queries,
+            max_inactive_connection_lifetime=self._max_inactive_connection_lifetime,
+            command_timeout=5,
+            statement_cache_size=1024,
+            max_cached_statement_lifetime=0,
+            init=_init_connection,
+        )
 
     async def close(self) -> None:
         if self.pool:
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import logging
 
+import aiohttp
 import asyncpg
 import discord
 from discord import app_commands
@@ -27,6 +28,7 @@ class InviteSecurityBot(commands.AutoShardedBot):
         settings: Settings,
         pool: asyncpg.Pool,
         cache: RedisCache,
+        connector: aiohttp.BaseConnector | None = None,
     ) -> None:
         intents = discord.Intents.default()
         intents.guilds = True
@@ -38,6 +40,7 @@ class InviteSecurityBot(commands.AutoShardedBot):
             command_prefix=commands.when_mentioned,
             intents=intents,
             application_id=settings.application_id,
+            connector=connector,
         )
 
         self.settings = settings
@@ -45,26 +48,23 @@ class InviteSecurityBot(commands.AutoShardedBot):
         self.cache = cache
 
         self.locks = GuildLockManager()
-        self.invite_tracker = InviteTrackerService(pool, cache, settings, self.locks)
-        self.security = SecurityService(pool, cache, settings)
-        self.premium = PremiumService(pool)
-        self.analytics = AnalyticsService(pool)
-
-        self._synced = False
+        self.security = SecurityService(pool, cache, settings, self.locks)
+        self.invite_tracker = InviteTrackerService(pool, cache, settings, self.security)
+        self.premium = PremiumService(pool, cache, self.security.invalidate_guild_settings)
+        self.analytics = AnalyticsService(pool, cache)
 
     async def setup_hook(self) -> None:
+        await self.security.start()
+        await self.invite_tracker.start()
+
         await self.add_cog(InvitesCog(self, self.invite_tracker))
         await self.add_cog(SecurityCog(self, self.security))
         await self.add_cog(PremiumCog(self, self.premium))
 
         await self.tree.sync()
+        log.info("Slash commands synced")
 
     async def on_ready(self) -> None:
-        if not self._synced:
-            await self.tree.sync()
-            self._synced = True
-            log.info("Slash commands synced")
-
         log.info("Bot ready: %s (%s)", self.user, self.user.id if self.user else "n/a")
         await self.invite_tracker.rebuild_all_snapshots(self.guilds)
 
@@ -100,16 +100,13 @@ class InviteSecurityBot(commands.AutoShardedBot):
 
         burst = await self.security.check_join_burst(member.guild.id)
         if burst:
-            await self.security.log_incident(
-                member.guild.id,
+            await self.security.notify(
+                member.guild,
                 "join_burst_detected",
                 "critical",
                 f"Join burst threshold exceeded in guild {member.guild.id}",
-                metadata={"new_member": member.id},
-            )
-            await self.security.post_security_log(
-                member.guild,
                 "[SECURITY] Join burst detected. Consider immediate lockdown.",
+                metadata={"new_member": member.id},
             )
 
         await self.security.enforce_account_age(member)
@@ -131,6 +128,18 @@ class InviteSecurityBot(commands.AutoShardedBot):
     async def on_message(self, message: discord.Message) -> None:
         await self.security.handle_link_spam(message)
 
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role) -> None:
+        if before.name != after.name:
+            self.security.invalidate_quarantine_role(after.guild.id)
+
+    async def on_guild_role_delete(self, role: discord.Role) -> None:
+        self.security.invalidate_quarantine_role(role.guild.id)
+
+    async def close(self) -> None:
+        await self.invite_tracker.close()
+        await self.security.close()
+        await super().close()
+
     async def on_app_command_error(
         self,
         interaction: discord.Interaction,
@@ -151,5 +160,6 @@ async def create_bot(
     settings: Settings,
     pool: asyncpg.Pool,
     cache: RedisCache,
+    connector: aiohttp.BaseConnector | None = None,
 ) -> InviteSecurityBot:
-    return InviteSecurityBot(settings, pool, cache)
+    return InviteSecurityBot(settings, pool, cache, connector)
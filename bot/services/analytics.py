@@ -1,100 +1,142 @@
 from __future__ import annotations
 
+import asyncio
+from datetime import datetime, timedelta, timezone
+
 import asyncpg
 
+from bot.cache import RedisCache
 from bot.utils.premium import assert_premium
 
 
 class AnalyticsService:
-    def __init__(self, pool: asyncpg.Pool) -> None:
+    def __init__(self, pool: asyncpg.Pool, cache: RedisCache) -> None:
         self.pool = pool
+        self.cache = cache
 
-    async def guild_overview(self, guild_id: int) -> dict:
-        row = await self.pool.fetchrow(
+    async def guild_overview(self, guild_id: int) -> str:
+        return await self.pool.fetchval(
             """
-            SELECT
-                (SELECT COUNT(*) FROM invite_joins WHERE guild_id = $1) AS total_joins,
-                (SELECT COUNT(*) FROM invite_leaves WHERE guild_id = $1) AS total_leaves,
-                (SELECT COUNT(*) FROM incidents WHERE guild_id = $1) AS total_incidents,
-                (SELECT COUNT(*) FROM fraud_flags WHERE guild_id = $1) AS total_fraud_flags,
-                (SELECT is_premium FROM guilds WHERE guild_id = $1) AS is_premium
+            SELECT row_to_json(t)
+            FROM (
+                WITH j AS (SELECT COUNT(*) AS c FROM invite_joins WHERE guild_id = $1),
+                     l AS (SELECT COUNT(*) AS c FROM invite_leaves WHERE guild_id = $1),
+                     i AS (SELECT COUNT(*) AS c FROM incidents WHERE guild_id = $1),
+                     f AS (SELECT COUNT(*) AS c FROM fraud_flags WHERE guild_id = $1)
+                SELECT j.c AS total_joins,
+                       l.c AS total_leaves,
+                       i.c AS total_incidents,
+                       f.c AS total_fraud_flags,
+                       g.is_premium
+                FROM j
+                CROSS JOIN l
+                CROSS JOIN i
+                CROSS JOIN f
+                LEFT JOIN guilds g ON g.guild_id = $1
+            ) t
             """,
             guild_id,
         )
-        return dict(row) if row else {}
 
-    async def guild_invites(self, guild_id: int) -> list[dict]:
-        rows = await self.pool.fetch(
+    async def guild_invites(self, guild_id: int) -> str:
+        return await self.pool.fetchval(
             """
-            SELECT invite_code, inviter_id, uses, max_uses, is_temporary, created_at, updated_at
-            FROM invites
-            WHERE guild_id = $1
-            ORDER BY uses DESC, updated_at DESC
+            SELECT COALESCE(json_agg(t), '[]'::json)
+            FROM (
+                SELECT invite_code, inviter_id, uses, max_uses, is_temporary, created_at, updated_at
+                FROM invites
+                WHERE guild_id = $1
+                ORDER BY uses DESC, updated_at DESC
+            ) t
             """,
             guild_id,
         )
-        return [dict(r) for r in rows]
 
-    async def guild_security(self, guild_id: int) -> dict:
-        incidents = await self.pool.fetch(
-            """
-            SELECT incident_type, severity, actor_id, message, metadata, created_at
-            FROM incidents
-            WHERE guild_id = $1
-            ORDER BY created_at DESC
-            LIMIT 100
-            """,
-            guild_id,
-        )
-        settings = await self.pool.fetchrow(
-            """
-            SELECT lockdown_enabled, join_burst_count, join_burst_window_seconds,
-                   min_account_age_hours, auto_kick_young_accounts,
-                   link_spam_threshold, link_spam_window_seconds
-            FROM guilds
-            WHERE guild_id = $1
-            """,
-            guild_id,
+    async def guild_security(self, guild_id: int) -> str:
+        incidents, settings = await asyncio.gather(
+            self.pool.fetchval(
+                """
+                SELECT COALESCE(json_agg(t), '[]'::json)
+                FROM (
+                    SELECT incident_type, severity, actor_id, message, metadata, created_at
+                    FROM incidents
+                    WHERE guild_id = $1
+                    ORDER BY created_at DESC
+                    LIMIT 100
+                ) t
+                """,
+                guild_id,
+            ),
+            self.pool.fetchval(
+                """
+                SELECT COALESCE(
+                    (
+                        SELECT row_to_json(t)
+                        FROM (
+                            SELECT lockdown_enabled, join_burst_count, join_burst_window_seconds,
+                                   min_account_age_hours, auto_kick_young_accounts,
+                                   link_spam_threshold, link_spam_window_seconds
+                            FROM guilds
+                            WHERE guild_id = $1
+                        ) t
+                    ),
+                    '{}'::json
+                )
+                """,
+                guild_id,
+            ),
         )
-        return {
-            "settings": dict(settings) if settings else {},
-            "recent_incidents": [dict(i) for i in incidents],
-        }
+        return f'{{"settings":{settings},"recent_incidents":{incidents}}}'
 
-    async def leaderboard(self, limit: int = 25) -> list[dict]:
-        rows = await self.pool.fetch(
+    async def leaderboard(self, limit: int = 25) -> str:
+        return await self.pool.fetchval(
             """
-            SELECT guild_id, user_id, total_invites, real_invites, fake_invites, leaves, rejoins, bonus_invites,
-                   (real_invites + bonus_invites - fake_invites - leaves) AS net_invites
-            FROM user_invite_stats
-            ORDER BY net_invites DESC, total_invites DESC
-            LIMIT $1
+            SELECT COALESCE(json_agg(t), '[]'::json)
+            FROM (
+                SELECT guild_id, user_id, total_invites, real_invites, fake_invites, leaves, rejoins, bonus_invites,
+                       net_invites
+                FROM user_invite_stats
+                ORDER BY net_invites DESC, total_invites DESC
+                LIMIT $1
+            ) t
             """,
             limit,
         )
-        return [dict(r) for r in rows]
 
-    async def incidents(self, limit: int = 200) -> list[dict]:
-        rows = await self.pool.fetch(
+    async def incidents(self, limit: int = 200) -> str:
+        return await self.pool.fetchval(
             """
-            SELECT guild_id, incident_type, severity, actor_id, message, metadata, created_at
-            FROM incidents
-            ORDER BY created_at DESC
-            LIMIT $1
+            SELECT COALESCE(json_agg(t), '[]'::json)
+            FROM (
+                SELECT guild_id, incident_type, severity, actor_id, message, metadata, created_at
+                FROM incidents
+                ORDER BY created_at DESC
+                LIMIT $1
+            ) t
             """,
             limit,
         )
-        return [dict(r) for r in rows]
 
-    async def security_analytics(self, guild_id: int) -> dict:
-        await assert_premium(self.pool, guild_id)
-        row = await self.pool.fetchrow(
+    async def security_analytics(self, guild_id: int) -> str:
+        await assert_premium(self.pool, guild_id, self.cache)
+        since = datetime.now(timezone.utc) - timedelta(hours=24)
+        return await self.pool.fetchval(
             """
-            SELECT
-                (SELECT COUNT(*) FROM incidents WHERE guild_id = $1 AND created_at > NOW() - INTERVAL '24 hour') AS incidents_24h,
-                (SELECT COUNT(*) FROM fraud_flags WHERE guild_id = $1 AND created_at > NOW() - INTERVAL '24 hour') AS fraud_flags_24h,
-                (SELECT AVG(score) FROM fraud_flags WHERE guild_id = $1 AND created_at > NOW() - INTERVAL '24 hour') AS avg_fraud_score_24h
+            SELECT row_to_json(t)
+            FROM (
+                SELECT i.incidents_24h, f.fraud_flags_24h, f.avg_fraud_score_24h
+                FROM (
+                    SELECT COUNT(*) AS incidents_24h
+                    FROM incidents
+                    WHERE guild_id = $1 AND created_at > $2
+                ) i
+                CROSS JOIN (
+                    SELECT COUNT(*) AS fraud_flags_24h, AVG(score) AS avg_fraud_score_24h
+                    FROM fraud_flags
+                    WHERE guild_id = $1 AND created_at > $2
+                ) f
+            ) t
             """,
             guild_id,
+            since,
         )
-        return dict(row) if row else {}
@@ -1,64 +1,293 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
-from dataclasses import dataclass
 from datetime import datetime, timezone
+from typing import Awaitable, NamedTuple
 
 import asyncpg
 import discord
+import msgpack
 
 from bot.cache import RedisCache
 from bot.config import Settings
-from bot.utils.locks import GuildLockManager
+from bot.services.security import SecurityService
 
 log = logging.getLogger(__name__)
 
+GUILD_UPSERT_BATCH_SIZE = 500
+# Startup backfills can far exceed the pool's short per-command timeout.
+BULK_WRITE_TIMEOUT_SECONDS = 120
+INVITE_FLUSH_INTERVAL_SECONDS = 0.05
+INVITE_FLUSH_BATCH_SIZE = 32
+JOIN_BATCH_MAX_SIZE = 50
+JOIN_EFFECTS_FLUSH_INTERVAL_SECONDS = 0.02
+JOIN_EFFECTS_BATCH_SIZE = 64
+JOIN_EFFECTS_QUEUE_MAX_SIZE = 10_000
+
+UPSERT_INVITE_SQL = """
+INSERT INTO invites (guild_id, invite_code, inviter_id, uses, max_uses, is_temporary, created_at)
+VALUES ($1, $2, $3, $4, $5, $6, COALESCE($7, NOW()))
+ON CONFLICT (guild_id, invite_code)
+DO UPDATE SET inviter_id = EXCLUDED.inviter_id,
+              uses = EXCLUDED.uses,
+              max_uses = EXCLUDED.max_uses,
+              is_temporary = EXCLUDED.is_temporary,
+              deleted_at = NULL,
+              updated_at = NOW()
+"""
+
+INVITE_COLUMNS = ("guild_id", "invite_code", "inviter_id", "uses", "max_uses", "is_temporary", "created_at")
+
+BULK_UPSERT_INVITES_SQL = """
+INSERT INTO invites (guild_id, invite_code, inviter_id, uses, max_uses, is_temporary, created_at)
+SELECT guild_id, invite_code, inviter_id, uses, max_uses, is_temporary, COALESCE(created_at, NOW())
+FROM invite_backfill
+ON CONFLICT (guild_id, invite_code)
+DO UPDATE SET inviter_id = EXCLUDED.inviter_id,
+              uses = EXCLUDED.uses,
+              max_uses = EXCLUDED.max_uses,
+              is_temporary = EXCLUDED.is_temporary,
+              deleted_at = NULL,
+              updated_at = NOW()
+"""
+
+UPSERT_GUILD_SQL = """
+INSERT INTO guilds (
+    guild_id,
+    guild_name,
+    join_burst_count,
+    join_burst_window_seconds,
+    min_account_age_hours,
+    auto_kick_young_accounts,
+    link_spam_threshold,
+    link_spam_window_seconds,
+    lockdown_slowmode_seconds,
+    quarantine_role_name
+)
+VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+ON CONFLICT (guild_id) DO UPDATE
+    SET guild_name = EXCLUDED.guild_name,
+        updated_at = NOW()
+"""
+
+# Writes the invite_joins row (and upserts the user) on the join's critical
+# path and reports whether the member is rejoining.
+RECORD_JOIN_SQL = """
+WITH flags AS (
+    SELECT EXISTS (
+        SELECT 1 FROM invite_leaves WHERE guild_id = $1 AND member_id = $2
+    ) AS is_rejoin
+),
+upsert_user AS (
+    INSERT INTO users (user_id, username, discriminator)
+    VALUES ($2, $3, $4)
+    ON CONFLICT (user_id)
+    DO UPDATE SET username = EXCLUDED.username,
+                  discriminator = EXCLUDED.discriminator,
+                  updated_at = NOW()
+)
+INSERT INTO invite_joins (
+    guild_id,
+    member_id,
+    invite_code,
+    inviter_id,
+    joined_at,
+    attribution_confidence,
+    attribution_reason,
+    is_fake,
+    is_rejoin
+)
+SELECT $1::bigint, $2::bigint, $5::text, $6::bigint, $7::timestamptz, $8::numeric, $9::text,
+       $10::boolean, flags.is_rejoin
+FROM flags
+RETURNING is_rejoin
+"""
+
+# Credits the inviter, bumps the invite's uses and flags young accounts.
+# These don't affect attribution, so they are batched off the join path.
+# Data-modifying CTEs all run even when not referenced.
+RECORD_JOIN_EFFECTS_SQL = """
+WITH update_stats AS (
+    INSERT INTO user_invite_stats (guild_id, user_id, total_invites, fake_invites, real_invites, rejoins)
+    SELECT $1::bigint, $4::bigint, 1, $5::boolean::int, (NOT $5::boolean)::int, $6::boolean::int
+    WHERE $4::bigint IS NOT NULL
+    ON CONFLICT (guild_id, user_id)
+    DO UPDATE SET total_invites = user_invite_stats.total_invites + 1,
+                  fake_invites = user_invite_stats.fake_invites + EXCLUDED.fake_invites,
+                  real_invites = user_invite_stats.real_invites + EXCLUDED.real_invites,
+                  rejoins = user_invite_stats.rejoins + EXCLUDED.rejoins,
+                  updated_at = NOW()
+),
+record_invite_use AS (
+    INSERT INTO invites (guild_id, invite_code, inviter_id, uses)
+    SELECT $1::bigint, $3::text, $4::bigint, 1
+    WHERE $3::text IS NOT NULL
+    ON CONFLICT (guild_id, invite_code)
+    DO UPDATE SET inviter_id = COALESCE(EXCLUDED.inviter_id, invites.inviter_id),
+                  uses = invites.uses + 1,
+                  updated_at = NOW()
+)
+INSERT INTO fraud_flags (guild_id, member_id, reason, score, metadata)
+SELECT $1::bigint,
+       $2::bigint,
+       'young_account',
+       ROUND(LEAST(1.0, ($8::int - $7::float8) / GREATEST(1.0, $8::int))::numeric, 4),
+       jsonb_build_object('age_hours', $7::float8, 'min_required_hours', $8::int)
+WHERE $5::boolean
+"""
+
+
+RECORD_LEAVE_SQL = """
+WITH last_join AS (
+    SELECT inviter_id
+    FROM invite_joins
+    WHERE guild_id = $1 AND member_id = $2
+    ORDER BY joined_at DESC
+    LIMIT 1
+),
+insert_leave AS (
+    INSERT INTO invite_leaves (guild_id, member_id, inviter_id, left_at)
+    VALUES ($1, $2, (SELECT inviter_id FROM last_join), NOW())
+    RETURNING inviter_id
+)
+INSERT INTO user_invite_stats (guild_id, user_id, leaves)
+SELECT $1, inviter_id, 1
+FROM insert_leave
+WHERE inviter_id IS NOT NULL
+ON CONFLICT (guild_id, user_id)
+DO UPDATE SET leaves = user_invite_stats.leaves + 1,
+              updated_at = NOW()
+"""
+
+
+class InviteSnapshotEntry(NamedTuple):
+    uses: int
+    inviter_id: int | None
+    created_at: int | None
+    max_uses: int | None
+    temporary: bool
+
+
+InviteSnapshot = dict[str, InviteSnapshotEntry]
 
-@dataclass
-class InviteAttribution:
+
+class InviteAttribution(NamedTuple):
     invite_code: str | None
     inviter_id: int | None
     confidence: float
     reason: str
 
 
+NO_INVITE_DELTA = InviteAttribution(None, None, 0.2, "no_invite_delta")
+
+
 class InviteTrackerService:
     def __init__(
         self,
         pool: asyncpg.Pool,
         cache: RedisCache,
         settings: Settings,
-        lock_manager: GuildLockManager,
+        security: SecurityService,
     ) -> None:
         self.pool = pool
         self.cache = cache
         self.settings = settings
-        self.lock_manager = lock_manager
+        self.security = security
+        self._ensured_guilds: set[int] = set()
+        self._snapshots: dict[int, InviteSnapshot] = {}
+        self._mirror_tasks: set[asyncio.Task] = set()
+        self._pending_invites: dict[tuple[int, str], tuple] = {}
+        self._invites_pending = asyncio.Event()
+        self._invite_batch_full = asyncio.Event()
+        self._invite_flusher: asyncio.Task | None = None
+        self._invite_flusher_stopping = False
+        self._invite_flush_lock = asyncio.Lock()
+        self._join_effects: asyncio.Queue[tuple | None] = asyncio.Queue(maxsize=JOIN_EFFECTS_QUEUE_MAX_SIZE)
+        self._join_effects_writer: asyncio.Task | None = None
+        self._join_queues: dict[int, asyncio.Queue] = {}
+        self._join_workers: dict[int, asyncio.Task] = {}
+
+    async def start(self) -> None:
+        if self._invite_flusher is None:
+            self._invite_flusher = asyncio.create_task(self._flush_invites_forever())
+        if self._join_effects_writer is None:
+            self._join_effects_writer = asyncio.create_task(self._write_join_effects_forever())
+
+    async def close(self) -> None:
+        if self._join_workers:
+            await asyncio.gather(*self._join_workers.values(), return_exceptions=True)
+        if self._join_effects_writer is not None:
+            # The sentinel lets the writer finish its current batch and drain the queue.
+            await self._join_effects.put(None)
+            await self._join_effects_writer
+            self._join_effects_writer = None
+        if self._invite_flusher is not None:
+            # Wake the flusher rather than cancelling it so an in-flight upsert
+            # is not abandoned after its rows were taken off the buffer.
+            self._invite_flusher_stopping = True
+            self._invites_pending.set()
+            self._invite_batch_full.set()
+            await self._invite_flusher
+            self._invite_flusher = None
+        await self._flush_invites()
+
+    async def _flush_invites(self) -> None:
+        async with self._invite_flush_lock:
+            if not self._pending_invites:
+                return
+            rows = list(self._pending_invites.values())
+            self._pending_invites.clear()
+            await self.pool.executemany(UPSERT_INVITE_SQL, rows)
+
+    async def _flush_invites_forever(self) -> None:
+        while not self._invite_flusher_stopping:
+            await self._invites_pending.wait()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._invite_batch_full.wait(), INVITE_FLUSH_INTERVAL_SECONDS)
+            self._invites_pending.clear()
+            self._invite_batch_full.clear()
+            try:
+                await self._flush_invites()
+            except Exception:
+                log.exception("Failed flushing buffered invite upserts")
+
+    async def _write_join_effects_forever(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._join_effects.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + JOIN_EFFECTS_FLUSH_INTERVAL_SECONDS
+            while len(batch) < JOIN_EFFECTS_BATCH_SIZE:
+                if not self._join_effects.empty():
+                    item = self._join_effects.get_nowait()
+                else:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._join_effects.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                await self.pool.executemany(RECORD_JOIN_EFFECTS_SQL, batch)
+            except Exception:
+                log.exception("Failed writing %s buffered join side effects", len(batch))
 
     @staticmethod
     def _snapshot_key(guild_id: int) -> str:
         return f"invite:snapshot:{guild_id}"
 
-    async def ensure_guild_row(self, guild: discord.Guild) -> None:
-        await self.pool.execute(
-            """
-            INSERT INTO guilds (
-                guild_id,
-                guild_name,
-                join_burst_count,
-                join_burst_window_seconds,
-                min_account_age_hours,
-                auto_kick_young_accounts,
-                link_spam_threshold,
-                link_spam_window_seconds,
-                lockdown_slowmode_seconds,
-                quarantine_role_name
-            )
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
-            ON CONFLICT (guild_id) DO UPDATE
-                SET guild_name = EXCLUDED.guild_name,
-                    updated_at = NOW()
-            """,
+    def _guild_row_args(self, guild: discord.Guild) -> tuple:
+        return (
             guild.id,
             guild.name,
             self.settings.default_join_burst_count,
@@ -71,56 +300,154 @@ class InviteTrackerService:
             self.settings.default_quarantine_role_name,
         )
 
-    async def rebuild_guild_snapshot(self, guild: discord.Guild) -> None:
+    async def ensure_guild_row(self, guild: discord.Guild) -> None:
+        await self.pool.execute(UPSERT_GUILD_SQL, *self._guild_row_args(guild))
+        self._ensured_guilds.add(guild.id)
+
+    async def _min_account_age_hours(self, guild_id: int) -> int:
+        # Read through the shared settings cache so config changes invalidate one place.
+        settings = await self.security.get_guild_settings(guild_id)
+        if not settings:
+            return self.settings.default_min_account_age_hours
+        return settings["min_account_age_hours"]
+
+    async def ensure_guild_rows(self, guilds: list[discord.Guild]) -> None:
+        for start in range(0, len(guilds), GUILD_UPSERT_BATCH_SIZE):
+            batch = guilds[start : start + GUILD_UPSERT_BATCH_SIZE]
+            await self.pool.executemany(
+                UPSERT_GUILD_SQL,
+                [self._guild_row_args(g) for g in batch],
+                timeout=BULK_WRITE_TIMEOUT_SECONDS,
+            )
+            for guild in batch:
+                self._ensured_guilds.add(guild.id)
+
+    @staticmethod
+    def _snapshot_entry(invite: discord.Invite) -> InviteSnapshotEntry:
+        return InviteSnapshotEntry(
+            uses=invite.uses or 0,
+            inviter_id=invite.inviter.id if invite.inviter else None,
+            created_at=int(invite.created_at.timestamp()) if invite.created_at else None,
+            max_uses=invite.max_uses,
+            temporary=bool(invite.temporary),
+        )
+
+    async def _load_snapshot(self, guild_id: int) -> InviteSnapshot:
+        snapshot = self._snapshots.get(guild_id)
+        if snapshot is not None:
+            return snapshot
+        # Cold miss (e.g. after a restart before the rebuild finished): recover from Redis.
+        raw = await self.cache.hgetall(self._snapshot_key(guild_id))
+        snapshot = {code.decode(): InviteSnapshotEntry(*msgpack.unpackb(value)) for code, value in raw.items()}
+        self._snapshots[guild_id] = snapshot
+        return snapshot
+
+    def _mirror(self, coro: Awaitable[None]) -> None:
+        task = asyncio.create_task(coro)
+        self._mirror_tasks.add(task)
+        task.add_done_callback(self._on_mirror_done)
+
+    def _on_mirror_done(self, task: asyncio.Task) -> None:
+        self._mirror_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.warning("Failed mirroring invite snapshot to Redis", exc_info=task.exception())
+
+    async def _store_snapshots(self, snapshots: dict[int, InviteSnapshot]) -> None:
+        await self.cache.replace_hashes(
+            {
+                self._snapshot_key(guild_id): {code: msgpack.packb(entry) for code, entry in snapshot.items()}
+                for guild_id, snapshot in snapshots.items()
+            }
+        )
+
+    async def _store_snapshot_diff(self, guild_id: int, previous: InviteSnapshot, current: InviteSnapshot) -> None:
+        # Joins usually bump a single invite, so only write what actually changed.
+        changed = {code: msgpack.packb(entry) for code, entry in current.items() if previous.get(code) != entry}
+        removed = [code for code in previous if code not in current]
+        await self.cache.update_hash(self._snapshot_key(guild_id), changed, removed)
+
+    async def _bulk_upsert_invites(self, rows: list[tuple]) -> None:
+        if not rows:
+            return
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    """
+                    CREATE TEMP TABLE invite_backfill (
+                        guild_id BIGINT,
+                        invite_code TEXT,
+                        inviter_id BIGINT,
+                        uses INT,
+                        max_uses INT,
+                        is_temporary BOOLEAN,
+                        created_at TIMESTAMPTZ
+                    ) ON COMMIT DROP
+                    """
+                )
+                await conn.copy_records_to_table(
+                    "invite_backfill",
+                    records=rows,
+                    columns=INVITE_COLUMNS,
+                    timeout=BULK_WRITE_TIMEOUT_SECONDS,
+                )
+                await conn.execute(BULK_UPSERT_INVITES_SQL, timeout=BULK_WRITE_TIMEOUT_SECONDS)
+
+    async def _build_snapshot(self, guild: discord.Guild) -> InviteSnapshot | None:
         try:
             invites = await guild.invites()
         except discord.Forbidden:
             log.warning("Missing permissions to read invites for guild=%s", guild.id)
-            return
-
-        snapshot = {}
-        for inv in invites:
-            snapshot[inv.code] = {
-                "uses": inv.uses or 0,
-                "inviter_id": inv.inviter.id if inv.inviter else None,
-                "created_at": inv.created_at.isoformat() if inv.created_at else None,
-                "max_uses": inv.max_uses,
-                "temporary": inv.temporary,
-            }
+            return None
+        return {inv.code: self._snapshot_entry(inv) for inv in invites}
 
-        await self.cache.set_json(self._snapshot_key(guild.id), snapshot)
+    async def rebuild_guild_snapshot(self, guild: discord.Guild) -> None:
+        snapshot = await self._build_snapshot(guild)
+        if snapshot is not None:
+            self._snapshots[guild.id] = snapshot
+            await self._store_snapshots({guild.id: snapshot})
 
     async def rebuild_all_snapshots(self, guilds: list[discord.Guild]) -> None:
-        for guild in guilds:
-            await self.ensure_guild_row(guild)
-            await self.rebuild_guild_snapshot(guild)
+        await self.ensure_guild_rows(guilds)
+
+        sem = asyncio.Semaphore(self.settings.snapshot_rebuild_concurrency)
+
+        async def build(guild: discord.Guild) -> InviteSnapshot | None:
+            async with sem:
+                return await self._build_snapshot(guild)
+
+        snapshots = await asyncio.gather(*(build(g) for g in guilds))
+        built = {guild.id: snapshot for guild, snapshot in zip(guilds, snapshots) if snapshot is not None}
+        self._snapshots.update(built)
+        await self._store_snapshots(built)
+        await self._bulk_upsert_invites(
+            [
+                (
+                    guild_id,
+                    code,
+                    entry.inviter_id,
+                    entry.uses,
+                    entry.max_uses,
+                    entry.temporary,
+                    datetime.fromtimestamp(entry.created_at, timezone.utc) if entry.created_at else None,
+                )
+                for guild_id, snapshot in built.items()
+                for code, entry in snapshot.items()
+            ]
+        )
 
     async def on_invite_create(self, invite: discord.Invite) -> None:
         if not invite.guild:
             return
-        key = self._snapshot_key(invite.guild.id)
-        snapshot = await self.cache.get_json(key) or {}
-        snapshot[invite.code] = {
-            "uses": invite.uses or 0,
-            "inviter_id": invite.inviter.id if invite.inviter else None,
-            "created_at": invite.created_at.isoformat() if invite.created_at else None,
-            "max_uses": invite.max_uses,
-            "temporary": invite.temporary,
-        }
-        await self.cache.set_json(key, snapshot)
-
-        await self.pool.execute(
-            """
-            INSERT INTO invites (guild_id, invite_code, inviter_id, uses, max_uses, is_temporary, created_at)
-            VALUES ($1, $2, $3, $4, $5, $6, COALESCE($7, NOW()))
-            ON CONFLICT (guild_id, invite_code)
-            DO UPDATE SET inviter_id = EXCLUDED.inviter_id,
-                          uses = EXCLUDED.uses,
-                          max_uses = EXCLUDED.max_uses,
-                          is_temporary = EXCLUDED.is_temporary,
-                          deleted_at = NULL,
-                          updated_at = NOW()
-            """,
+        entry = self._snapshot_entry(invite)
+        snapshot = self._snapshots.get(invite.guild.id)
+        if snapshot is not None:
+            # Redelivered events (e.g. after a gateway resume) carry nothing new.
+            if snapshot.get(invite.code) == entry:
+                return
+            snapshot[invite.code] = entry
+        self._mirror(self.cache.hset(self._snapshot_key(invite.guild.id), invite.code, msgpack.packb(entry)))
+
+        row = (
             invite.guild.id,
             invite.code,
             invite.inviter.id if invite.inviter else None,
@@ -129,233 +456,187 @@ class InviteTrackerService:
             invite.temporary,
             invite.created_at,
         )
+        if self._invite_flusher is None:
+            await self.pool.execute(UPSERT_INVITE_SQL, *row)
+            return
+
+        # Bursts of invite events are coalesced per invite and written with executemany.
+        self._pending_invites[(invite.guild.id, invite.code)] = row
+        self._invites_pending.set()
+        if len(self._pending_invites) >= INVITE_FLUSH_BATCH_SIZE:
+            self._invite_batch_full.set()
 
     async def on_invite_delete(self, invite: discord.Invite) -> None:
         if not invite.guild:
             return
-        key = self._snapshot_key(invite.guild.id)
-        snapshot = await self.cache.get_json(key) or {}
-        snapshot.pop(invite.code, None)
-        await self.cache.set_json(key, snapshot)
+        snapshot = self._snapshots.get(invite.guild.id)
+        if snapshot is not None:
+            snapshot.pop(invite.code, None)
+        self._mirror(self.cache.hdel(self._snapshot_key(invite.guild.id), invite.code))
 
+        # Make sure a buffered upsert for this invite lands before it is marked deleted.
+        await self._flush_invites()
         await self.pool.execute(
             """
             UPDATE invites
             SET deleted_at = NOW(), updated_at = NOW()
-            WHERE guild_id = $1 AND invite_code = $2
+            WHERE guild_id = $1 AND invite_code = $2 AND deleted_at IS NULL
             """,
             invite.guild.id,
             invite.code,
         )
 
-    async def _fetch_current_invites(self, guild: discord.Guild) -> dict[str, dict]:
-        invites = await guild.invites()
-        current = {}
-        for inv in invites:
-            current[inv.code] = {
-                "uses": inv.uses or 0,
-                "inviter_id": inv.inviter.id if inv.inviter else None,
-                "created_at": inv.created_at.isoformat() if inv.created_at else None,
-                "max_uses": inv.max_uses,
-                "temporary": inv.temporary,
-            }
-        return current
-
-    async def _detect_used_invite(self, guild: discord.Guild, current: dict[str, dict]) -> InviteAttribution:
-        previous = await self.cache.get_json(self._snapshot_key(guild.id)) or {}
-
-        increased = []
+    @staticmethod
+    def _attribution(current: InviteSnapshot, code: str, candidates: int) -> InviteAttribution:
+        inviter_id = current[code].inviter_id
+        if candidates == 1:
+            return InviteAttribution(code, inviter_id, 0.96, "single_delta")
+        confidence = max(0.45, 0.75 - ((candidates - 1) * 0.08))
+        return InviteAttribution(code, inviter_id, confidence, "multi_delta")
+
+    @classmethod
+    def _detect_used_invites(
+        cls, previous: InviteSnapshot, current: InviteSnapshot, count: int
+    ) -> list[InviteAttribution]:
+        if count == 1:
+            # Common case: a single pass tracking the argmax, no intermediate dict.
+            best_code = None
+            best_delta = 0
+            candidates = 0
+            for code, now_val in current.items():
+                old = previous.get(code)
+                delta = now_val.uses - (old.uses if old else 0)
+                if delta > 0:
+                    candidates += 1
+                    if delta > best_delta:
+                        best_code, best_delta = code, delta
+            if best_code is None:
+                return [NO_INVITE_DELTA]
+            return [cls._attribution(current, best_code, candidates)]
+
+        remaining = {}
         for code, now_val in current.items():
-            old_uses = previous.get(code, {}).get("uses", 0)
-            delta = now_val["uses"] - old_uses
+            old = previous.get(code)
+            delta = now_val.uses - (old.uses if old else 0)
             if delta > 0:
-                increased.append((code, delta, now_val.get("inviter_id")))
-
-        if not increased:
-            return InviteAttribution(None, None, 0.2, "no_invite_delta")
+                remaining[code] = delta
+
+        # Joins are attributed in arrival order, each consuming one use from the
+        # invite with the largest outstanding delta.
+        attributions = []
+        for _ in range(count):
+            if not remaining:
+                attributions.append(NO_INVITE_DELTA)
+                continue
+
+            code = max(remaining, key=remaining.__getitem__)
+            attributions.append(cls._attribution(current, code, len(remaining)))
+            remaining[code] -= 1
+            if not remaining[code]:
+                del remaining[code]
+        return attributions
 
-        increased.sort(key=lambda x: x[1], reverse=True)
-        winner = increased[0]
-        if len(increased) == 1:
-            return InviteAttribution(winner[0], winner[2], 0.96, "single_delta")
+    async def on_member_join(self, member: discord.Member) -> InviteAttribution:
+        guild_id = member.guild.id
+        future: asyncio.Future[InviteAttribution] = asyncio.get_running_loop().create_future()
+        queue = self._join_queues.get(guild_id)
+        if queue is None:
+            queue = self._join_queues[guild_id] = asyncio.Queue()
+        queue.put_nowait((member, datetime.now(timezone.utc), future))
+        if guild_id not in self._join_workers:
+            self._join_workers[guild_id] = asyncio.create_task(self._process_joins(member.guild, queue))
+        return await future
+
+    async def _process_joins(self, guild: discord.Guild, queue: asyncio.Queue) -> None:
+        # One worker per guild drains queued joins in batches so a burst shares a
+        # single invite listing instead of serialising one REST call per join.
+        try:
+            while not queue.empty():
+                batch = [queue.get_nowait() for _ in range(min(queue.qsize(), JOIN_BATCH_MAX_SIZE))]
+                try:
+                    attributions = await self._attribute_joins(guild, len(batch))
+                    min_age = await self._min_account_age_hours(guild.id)
+                    # The batch's writes share one pooled connection instead of
+                    # acquiring and releasing one per statement.
+                    async with self.pool.acquire() as conn:
+                        for (member, joined_at, future), attribution in zip(batch, attributions):
+                            try:
+                                await self._record_join(conn, member, joined_at, attribution, min_age)
+                            except Exception as exc:
+                                if not future.done():
+                                    future.set_exception(exc)
+                            else:
+                                if not future.done():
+                                    future.set_result(attribution)
+                except Exception as exc:
+                    for _, _, future in batch:
+                        if not future.done():
+                            future.set_exception(exc)
+        finally:
+            self._join_workers.pop(guild.id, None)
+            if queue.empty():
+                self._join_queues.pop(guild.id, None)
+
+    async def _attribute_joins(self, guild: discord.Guild, count: int) -> list[InviteAttribution]:
+        if guild.id not in self._ensured_guilds:
+            await self.ensure_guild_row(guild)
 
-        confidence = max(0.45, 0.75 - ((len(increased) - 1) * 0.08))
-        return InviteAttribution(winner[0], winner[2], confidence, "multi_delta")
+        # Gateway events don't carry invite use counts, so attribution still needs
+        # the REST listing; skip it when there are no known invites to diff against.
+        previous = await self._load_snapshot(guild.id)
+        current = await self._build_snapshot(guild) if previous else None
+        if current is None:
+            return [NO_INVITE_DELTA] * count
 
-    async def _upsert_user(self, user: discord.abc.User) -> None:
-        await self.pool.execute(
-            """
-            INSERT INTO users (user_id, username, discriminator)
-            VALUES ($1, $2, $3)
-            ON CONFLICT (user_id)
-            DO UPDATE SET username = EXCLUDED.username,
-                          discriminator = EXCLUDED.discriminator,
-                          updated_at = NOW()
-            """,
-            user.id,
-            str(user),
-            getattr(user, "discriminator", "0"),
-        )
+        self._snapshots[guild.id] = current
+        self._mirror(self._store_snapshot_diff(guild.id, previous, current))
+        return self._detect_used_invites(previous, current, count)
 
-    async def _update_invite_stats(
+    async def _record_join(
         self,
-        guild_id: int,
-        inviter_id: int,
-        is_fake: bool,
-        is_rejoin: bool,
+        conn: asyncpg.Connection,
+        member: discord.Member,
+        now: datetime,
+        attribution: InviteAttribution,
+        min_age: int,
     ) -> None:
-        await self.pool.execute(
-            """
-            INSERT INTO user_invite_stats (guild_id, user_id, total_invites, fake_invites, real_invites, rejoins)
-            VALUES ($1, $2, 1, $3, $4, $5)
-            ON CONFLICT (guild_id, user_id)
-            DO UPDATE SET total_invites = user_invite_stats.total_invites + 1,
-                          fake_invites = user_invite_stats.fake_invites + $3,
-                          real_invites = user_invite_stats.real_invites + $4,
-                          rejoins = user_invite_stats.rejoins + $5,
-                          updated_at = NOW()
-            """,
-            guild_id,
-            inviter_id,
-            1 if is_fake else 0,
-            0 if is_fake else 1,
-            1 if is_rejoin else 0,
-        )
-
-    async def on_member_join(self, member: discord.Member) -> InviteAttribution:
-        lock = self.lock_manager.get(member.guild.id)
-        async with lock:
-            now = datetime.now(timezone.utc)
-            await self.ensure_guild_row(member.guild)
-            await self._upsert_user(member)
-
-            current = await self._fetch_current_invites(member.guild)
-            attribution = await self._detect_used_invite(member.guild, current)
-            await self.cache.set_json(self._snapshot_key(member.guild.id), current)
-
-            settings_row = await self.pool.fetchrow(
-                "SELECT min_account_age_hours FROM guilds WHERE guild_id = $1", member.guild.id
-            )
-            min_age = settings_row["min_account_age_hours"] if settings_row else self.settings.default_min_account_age_hours
-            age_hours = max(0.0, (now - member.created_at).total_seconds() / 3600)
-            is_fake = age_hours < min_age
-
-            prior_leave = await self.pool.fetchrow(
-                """
-                SELECT id FROM invite_leaves
-                WHERE guild_id = $1 AND member_id = $2
-                ORDER BY left_at DESC
-                LIMIT 1
-                """,
-                member.guild.id,
-                member.id,
-            )
-            is_rejoin = prior_leave is not None
-
-            await self.pool.execute(
-                """
-                INSERT INTO invite_joins (
-                    guild_id,
-                    member_id,
-                    invite_code,
-                    inviter_id,
-                    joined_at,
-                    attribution_confidence,
-                    attribution_reason,
-                    is_fake,
-                    is_rejoin
-                )
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-                """,
-                member.guild.id,
-                member.id,
-                attribution.invite_code,
-                attribution.inviter_id,
-                now,
-                attribution.confidence,
-                attribution.reason,
-                is_fake,
-                is_rejoin,
-            )
-
-            if attribution.inviter_id:
-                await self._update_invite_stats(
-                    member.guild.id,
-                    attribution.inviter_id,
-                    is_fake,
-                    is_rejoin,
-                )
-
-            if attribution.invite_code:
-                await self.pool.execute(
-                    """
-                    INSERT INTO invites (guild_id, invite_code, inviter_id, uses)
-                    VALUES ($1, $2, $3, 1)
-                    ON CONFLICT (guild_id, invite_code)
-                    DO UPDATE SET inviter_id = COALESCE(EXCLUDED.inviter_id, invites.inviter_id),
-                                  uses = invites.uses + 1,
-                                  updated_at = NOW()
-                    """,
-                    member.guild.id,
-                    attribution.invite_code,
-                    attribution.inviter_id,
-                )
-
-            if is_fake:
-                score = round(min(1.0, (min_age - age_hours) / max(1.0, float(min_age))), 4)
-                await self.pool.execute(
-                    """
-                    INSERT INTO fraud_flags (guild_id, member_id, reason, score, metadata)
-                    VALUES ($1, $2, $3, $4, $5::jsonb)
-                    """,
-                    member.guild.id,
-                    member.id,
-                    "young_account",
-                    score,
-                    {
-                        "age_hours": age_hours,
-                        "min_required_hours": min_age,
-                    },
-                )
-
-            return attribution
-
-    async def on_member_remove(self, member: discord.Member) -> None:
-        row = await self.pool.fetchrow(
-            """
-            SELECT id, inviter_id
-            FROM invite_joins
-            WHERE guild_id = $1 AND member_id = $2
-            ORDER BY joined_at DESC
-            LIMIT 1
-            """,
+        age_hours = max(0.0, (now - member.created_at).total_seconds() / 3600)
+        is_fake = age_hours < min_age
+        is_rejoin = await conn.fetchval(
+            RECORD_JOIN_SQL,
             member.guild.id,
             member.id,
+            str(member),
+            getattr(member, "discriminator", "0"),
+            attribution.invite_code,
+            attribution.inviter_id,
+            now,
+            attribution.confidence,
+            attribution.reason,
+            is_fake,
         )
-        inviter_id = row["inviter_id"] if row else None
 
-        await self.pool.execute(
-            """
-            INSERT INTO invite_leaves (guild_id, member_id, inviter_id, left_at)
-            VALUES ($1, $2, $3, NOW())
-            """,
+        effects = (
             member.guild.id,
             member.id,
-            inviter_id,
+            attribution.invite_code,
+            attribution.inviter_id,
+            is_fake,
+            is_rejoin,
+            age_hours,
+            min_age,
         )
+        if self._join_effects_writer is None:
+            await conn.execute(RECORD_JOIN_EFFECTS_SQL, *effects)
+            return
+        try:
+            self._join_effects.put_nowait(effects)
+        except asyncio.QueueFull:
+            log.warning("Join side-effect queue full; writing synchronously for guild=%s", member.guild.id)
+            await conn.execute(RECORD_JOIN_EFFECTS_SQL, *effects)
 
-        if inviter_id:
-            await self.pool.execute(
-                """
-                INSERT INTO user_invite_stats (guild_id, user_id, leaves)
-                VALUES ($1, $2, 1)
-                ON CONFLICT (guild_id, user_id)
-                DO UPDATE SET leaves = user_invite_stats.leaves + 1,
-                              updated_at = NOW()
-                """,
-                member.guild.id,
-                inviter_id,
-            )
+    async def on_member_remove(self, member: discord.Member) -> None:
+        await self.pool.execute(RECORD_LEAVE_SQL, member.guild.id, member.id)
 
     async def add_bonus_invites(self, guild_id: int, user_id: int, amount: int, reason: str) -> None:
         if amount == 0:
@@ -387,7 +668,7 @@ class InviteTrackerService:
         return await self.pool.fetchrow(
             """
             SELECT guild_id, user_id, total_invites, real_invites, fake_invites, leaves, rejoins, bonus_invites,
-                   (real_invites + bonus_invites - fake_invites - leaves) AS net_invites
+                   net_invites
             FROM user_invite_stats
             WHERE guild_id = $1 AND user_id = $2
             """,
@@ -399,7 +680,7 @@ class InviteTrackerService:
         return await self.pool.fetch(
             """
             SELECT user_id, total_invites, real_invites, fake_invites, leaves, rejoins, bonus_invites,
-                   (real_invites + bonus_invites - fake_invites - leaves) AS net_invites
+                   net_invites
             FROM user_invite_stats
             WHERE guild_id = $1
             ORDER BY net_invites DESC, total_invites DESC
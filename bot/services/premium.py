@@ -1,14 +1,24 @@
 from __future__ import annotations
 
 import hashlib
-from datetime import datetime, timezone
+from collections.abc import Awaitable, Callable
 
 import asyncpg
 
+from bot.cache import RedisCache
+from bot.utils.premium import premium_cache_key
+
 
 class PremiumService:
-    def __init__(self, pool: asyncpg.Pool) -> None:
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        cache: RedisCache,
+        invalidate_guild_settings: Callable[[int], Awaitable[None]],
+    ) -> None:
         self.pool = pool
+        self.cache = cache
+        self.invalidate_guild_settings = invalidate_guild_settings
 
     @staticmethod
     def _hash_key(key: str) -> str:
@@ -27,66 +37,44 @@ class PremiumService:
     async def activate_license(self, guild_id: int, raw_key: str, actor_id: int) -> bool:
         key_hash = self._hash_key(raw_key)
 
-        async with self.pool.acquire() as conn:
-            async with conn.transaction():
-                lic = await conn.fetchrow(
-                    """
-                    SELECT id, is_active, max_guilds, expires_at,
-                           COALESCE(array_length(activated_guild_ids, 1), 0) AS used_count,
-                           activated_guild_ids
-                    FROM premium_licenses
-                    WHERE key_hash = $1
-                    FOR UPDATE
-                    """,
-                    key_hash,
-                )
-
-                if not lic or not lic["is_active"]:
-                    return False
-
-                expires = lic["expires_at"]
-                if expires and expires < datetime.now(timezone.utc):
-                    return False
-
-                activated = list(lic["activated_guild_ids"] or [])
-                if guild_id not in activated and len(activated) >= lic["max_guilds"]:
-                    return False
-
-                if guild_id not in activated:
-                    activated.append(guild_id)
-                    await conn.execute(
-                        """
-                        UPDATE premium_licenses
-                        SET activated_guild_ids = $2,
-                            updated_at = NOW()
-                        WHERE id = $1
-                        """,
-                        lic["id"],
-                        activated,
-                    )
-
-                await conn.execute(
-                    """
-                    UPDATE guilds
-                    SET is_premium = TRUE,
-                        premium_license_id = $2,
-                        premium_until = $3,
-                        updated_at = NOW()
-                    WHERE guild_id = $1
-                    """,
-                    guild_id,
-                    lic["id"],
-                    expires,
-                )
-
-                await conn.execute(
-                    """
-                    INSERT INTO incidents (guild_id, incident_type, severity, actor_id, message, metadata)
-                    VALUES ($1, 'premium_activated', 'low', $2, 'Premium license activated', $3::jsonb)
-                    """,
-                    guild_id,
-                    actor_id,
-                    {"license_id": lic["id"]},
-                )
+        incident_id = await self.pool.fetchval(
+            """
+            WITH lic AS (
+                UPDATE premium_licenses
+                SET activated_guild_ids = CASE
+                        WHEN $2 = ANY(activated_guild_ids) THEN activated_guild_ids
+                        ELSE array_append(activated_guild_ids, $2)
+                    END,
+                    updated_at = NOW()
+                WHERE key_hash = $1
+                  AND is_active
+                  AND (expires_at IS NULL OR expires_at > NOW())
+                  AND ($2 = ANY(activated_guild_ids)
+                       OR COALESCE(array_length(activated_guild_ids, 1), 0) < max_guilds)
+                RETURNING id, expires_at
+            ),
+            activate_guild AS (
+                UPDATE guilds
+                SET is_premium = TRUE,
+                    premium_license_id = lic.id,
+                    premium_until = lic.expires_at,
+                    updated_at = NOW()
+                FROM lic
+                WHERE guilds.guild_id = $2
+            )
+            INSERT INTO incidents (guild_id, incident_type, severity, actor_id, message, metadata)
+            SELECT $2, 'premium_activated', 'low', $3::bigint, 'Premium license activated',
+                   jsonb_build_object('license_id', lic.id)
+            FROM lic
+            RETURNING id
+            """,
+            key_hash,
+            guild_id,
+            actor_id,
+        )
+        if incident_id is None:
+            return False
 
-                return True
+        await self.cache.delete(premium_cache_key(guild_id))
+        await self.invalidate_guild_settings(guild_id)
+        return True
@@ -1,30 +1,195 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
-import re
+import time
+from collections.abc import Awaitable
 from datetime import datetime, timedelta, timezone
 
 import asyncpg
 import discord
+from cachetools import TTLCache
+from redis.commands.core import AsyncScript
 
 from bot.cache import RedisCache
 from bot.config import Settings
-from bot.utils.premium import PremiumRequiredError, assert_premium
+from bot.utils.locks import GuildLockManager
+from bot.utils.premium import assert_premium
 
 log = logging.getLogger(__name__)
-LINK_RE = re.compile(r"https?://|discord\.gg/", re.IGNORECASE)
+LINK_MARKERS = ("http://", "https://", "discord.gg/")
+SEVERITY_WEIGHTS = {"low": 1, "medium": 2, "high": 4, "critical": 7}
+SEVERITY_NAMES = tuple(SEVERITY_WEIGHTS)
+SEVERITY_WEIGHT_VALUES = tuple(SEVERITY_WEIGHTS.values())
+GUILD_SETTINGS_CACHE_TTL_SECONDS = 60
+LOCAL_SETTINGS_CACHE_SIZE = 10_000
+LOCAL_SETTINGS_CACHE_TTL_SECONDS = 30
+INCIDENT_FLUSH_INTERVAL_SECONDS = 0.25
+INCIDENT_FLUSH_BATCH_SIZE = 100
+INCIDENT_QUEUE_MAX_SIZE = 10_000
+LOCKDOWN_CHANNEL = "lockdown_changed"
+LISTEN_RECONNECT_MIN_DELAY_SECONDS = 1
+LISTEN_RECONNECT_MAX_DELAY_SECONDS = 60
+LOCKDOWN_EDIT_CONCURRENCY = 10
+SLOWMODE_BACKUP_TTL_SECONDS = 86400
+INCIDENT_COLUMNS = ("guild_id", "incident_type", "severity", "actor_id", "message", "metadata", "created_at")
+
+# Sliding-window counter over two fixed buckets: KEYS = current bucket,
+# previous bucket; ARGV = share of the previous bucket still inside the
+# window, bucket TTL. Returns the estimated hits in the window, including this one.
+SLIDING_WINDOW_LUA = """
+local current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+return current + math.floor(previous * tonumber(ARGV[1]))
+"""
+
+
+
+def guild_settings_key(guild_id: int) -> str:
+    return f"guild:settings:{guild_id}"
+
+
+def slowmode_backup_key(guild_id: int) -> str:
+    return f"security:slowmode_backup:{guild_id}"
 
 
 class SecurityService:
-    def __init__(self, pool: asyncpg.Pool, cache: RedisCache, settings: Settings) -> None:
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        cache: RedisCache,
+        settings: Settings,
+        lock_manager: GuildLockManager,
+    ) -> None:
         self.pool = pool
         self.cache = cache
         self.settings = settings
+        self.lock_manager = lock_manager
+        self._settings_cache: TTLCache[int, dict] = TTLCache(
+            maxsize=LOCAL_SETTINGS_CACHE_SIZE,
+            ttl=LOCAL_SETTINGS_CACHE_TTL_SECONDS,
+        )
+        self._incident_queue: asyncio.Queue[tuple] = asyncio.Queue(maxsize=INCIDENT_QUEUE_MAX_SIZE)
+        self._incident_flusher: asyncio.Task | None = None
+        self._incident_batch_full = asyncio.Event()
+        self._incident_flusher_stopping = False
+        self._lockdown_guilds: set[int] = set()
+        self._listen_conn: asyncpg.Connection | None = None
+        self._listen_reconnect: asyncio.Task | None = None
+        self._closing = False
+        self._sliding_window: AsyncScript | None = None
+        self._quarantine_roles: dict[int, int] = {}
+
+    async def start(self) -> None:
+        if self._incident_flusher is None:
+            self._incident_flusher = asyncio.create_task(self._flush_incidents_forever())
+        if self._listen_conn is None:
+            await self._listen_for_lockdown_changes()
+
+    async def close(self) -> None:
+        if self._incident_flusher is not None:
+            # Let the flusher finish any in-flight COPY instead of cancelling
+            # it, which would drop the batch it already drained.
+            self._incident_flusher_stopping = True
+            self._incident_batch_full.set()
+            await self._incident_flusher
+            self._incident_flusher = None
+        await self._flush_incidents()
+
+        self._closing = True
+        if self._listen_reconnect is not None:
+            self._listen_reconnect.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listen_reconnect
+            self._listen_reconnect = None
+        conn, self._listen_conn = self._listen_conn, None
+        if conn is not None:
+            conn.remove_termination_listener(self._on_listen_conn_lost)
+            if not conn.is_closed():
+                await conn.remove_listener(LOCKDOWN_CHANNEL, self._on_lockdown_notify)
+            await self.pool.release(conn)
+
+    async def _listen_for_lockdown_changes(self) -> None:
+        conn = await self.pool.acquire()
+        try:
+            # Subscribe before loading the current state so no change is missed in between.
+            await conn.add_listener(LOCKDOWN_CHANNEL, self._on_lockdown_notify)
+            rows = await conn.fetch("SELECT guild_id FROM guilds WHERE lockdown_enabled")
+        except BaseException:
+            await self.pool.release(conn)
+            raise
+        conn.add_termination_listener(self._on_listen_conn_lost)
+        self._lockdown_guilds = {r["guild_id"] for r in rows}
+        self._listen_conn = conn
+
+    def _on_lockdown_notify(self, conn: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        guild_id, _, state = payload.partition(":")
+        if state == "on":
+            self._lockdown_guilds.add(int(guild_id))
+        else:
+            self._lockdown_guilds.discard(int(guild_id))
 
-    async def get_guild_settings(self, guild_id: int) -> asyncpg.Record | None:
-        return await self.pool.fetchrow("SELECT * FROM guilds WHERE guild_id = $1", guild_id)
+    def _on_listen_conn_lost(self, conn: asyncpg.Connection) -> None:
+        if conn is not self._listen_conn or self._closing:
+            return
+        log.warning("Lockdown listener connection closed; falling back to database lookups")
+        self._listen_conn = None
+        self._listen_reconnect = asyncio.create_task(self._relisten_for_lockdown_changes(conn))
+
+    async def _relisten_for_lockdown_changes(self, lost: asyncpg.Connection) -> None:
+        # Hand the dead connection back so the pool can replace it, then resubscribe.
+        # Resubscribing reloads the lockdown set, covering notifications missed meanwhile.
+        try:
+            await self.pool.release(lost)
+        except Exception:
+            log.warning("Failed releasing lost lockdown listener connection", exc_info=True)
+        delay = LISTEN_RECONNECT_MIN_DELAY_SECONDS
+        while not self._closing:
+            try:
+                await self._listen_for_lockdown_changes()
+            except Exception:
+                log.warning("Failed re-establishing lockdown listener; retrying in %ss", delay, exc_info=True)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, LISTEN_RECONNECT_MAX_DELAY_SECONDS)
+            else:
+                log.info("Lockdown listener re-established")
+                break
+        self._listen_reconnect = None
+
+    async def get_guild_settings(self, guild_id: int) -> dict | None:
+        settings = self._settings_cache.get(guild_id)
+        if settings is not None:
+            return settings
+
+        # Concurrent cold misses for one guild share a single Redis/Postgres lookup.
+        async with self.lock_manager.get(guild_id):
+            settings = self._settings_cache.get(guild_id)
+            if settings is not None:
+                return settings
+
+            key = guild_settings_key(guild_id)
+            settings = await self.cache.get_json(key)
+            if settings is None:
+                row = await self.pool.fetchrow("SELECT * FROM guilds WHERE guild_id = $1", guild_id)
+                if not row:
+                    return None
+                settings = dict(row)
+                await self.cache.set_json(key, settings, ex=GUILD_SETTINGS_CACHE_TTL_SECONDS)
+
+            self._settings_cache[guild_id] = settings
+            return settings
+
+    async def invalidate_guild_settings(self, guild_id: int) -> None:
+        self._settings_cache.pop(guild_id, None)
+        await self.cache.delete(guild_settings_key(guild_id))
 
     async def is_lockdown(self, guild_id: int) -> bool:
+        if self._listen_conn is not None:
+            return guild_id in self._lockdown_guilds
         row = await self.pool.fetchrow("SELECT lockdown_enabled FROM guilds WHERE guild_id = $1", guild_id)
         return bool(row and row["lockdown_enabled"])
 
@@ -37,51 +202,110 @@ class SecurityService:
         actor_id: int | None = None,
         metadata: dict | None = None,
     ) -> None:
-        await self.pool.execute(
-            """
-            INSERT INTO incidents (guild_id, incident_type, severity, actor_id, message, metadata)
-            VALUES ($1, $2, $3, $4, $5, $6::jsonb)
-            """,
+        record = (
             guild_id,
             incident_type,
             severity,
             actor_id,
             message,
             metadata or {},
+            datetime.now(timezone.utc),
         )
+        # Critical incidents are written immediately; everything else is
+        # buffered and written in bulk by the background flusher.
+        if severity != "critical" and self._incident_flusher is not None:
+            try:
+                self._incident_queue.put_nowait(record)
+                if self._incident_queue.qsize() >= INCIDENT_FLUSH_BATCH_SIZE:
+                    self._incident_batch_full.set()
+                return
+            except asyncio.QueueFull:
+                log.warning("Incident queue full; writing incident synchronously for guild=%s", guild_id)
 
-    async def post_security_log(self, guild: discord.Guild, content: str) -> None:
-        row = await self.pool.fetchrow(
-            "SELECT security_log_channel_id FROM guilds WHERE guild_id = $1", guild.id
+        await self.pool.execute(
+            """
+            INSERT INTO incidents (guild_id, incident_type, severity, actor_id, message, metadata, created_at)
+            VALUES ($1, $2, $3, $4, $5, $6::jsonb, $7)
+            """,
+            *record,
         )
-        if not row or not row["security_log_channel_id"]:
+
+    async def _flush_incidents(self) -> None:
+        batch = []
+        while not self._incident_queue.empty():
+            batch.append(self._incident_queue.get_nowait())
+        if not batch:
             return
-        channel = guild.get_channel(row["security_log_channel_id"])
+        async with self.pool.acquire() as conn:
+            await conn.copy_records_to_table("incidents", records=batch, columns=INCIDENT_COLUMNS)
+
+    async def _flush_incidents_forever(self) -> None:
+        while not self._incident_flusher_stopping:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._incident_batch_full.wait(), INCIDENT_FLUSH_INTERVAL_SECONDS)
+            self._incident_batch_full.clear()
+            try:
+                await self._flush_incidents()
+            except Exception:
+                log.exception("Failed flushing buffered incidents")
+
+    async def post_security_log(self, guild: discord.Guild, content: str, settings: dict | None = None) -> None:
+        if settings is None:
+            settings = await self.get_guild_settings(guild.id)
+        if not settings or not settings["security_log_channel_id"]:
+            return
+        channel = guild.get_channel(settings["security_log_channel_id"])
         if channel and isinstance(channel, discord.TextChannel):
             try:
                 await channel.send(content)
             except discord.HTTPException:
                 log.exception("Failed posting security log for guild=%s", guild.id)
 
+    async def _hit_sliding_window(self, key: str, window: int) -> int:
+        if self._sliding_window is None:
+            # Script objects run via EVALSHA and reload the script on NOSCRIPT.
+            self._sliding_window = self.cache.require_client().register_script(SLIDING_WINDOW_LUA)
+        window = max(1, window)
+        bucket, elapsed = divmod(time.time(), window)
+        bucket = int(bucket)
+        return int(
+            await self._sliding_window(
+                keys=[f"{key}:{bucket}", f"{key}:{bucket - 1}"],
+                args=[1 - elapsed / window, window * 2],
+            )
+        )
+
+    async def notify(
+        self,
+        guild: discord.Guild,
+        incident_type: str,
+        severity: str,
+        message: str,
+        log_content: str,
+        actor_id: int | None = None,
+        metadata: dict | None = None,
+        settings: dict | None = None,
+    ) -> None:
+        """Record an incident and post it to the security log channel concurrently."""
+        results = await asyncio.gather(
+            self.log_incident(guild.id, incident_type, severity, message, actor_id=actor_id, metadata=metadata),
+            self.post_security_log(guild, log_content, settings),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                log.error("Failed reporting %s for guild=%s", incident_type, guild.id, exc_info=result)
+
     async def check_join_burst(self, guild_id: int) -> bool:
         settings = await self.get_guild_settings(guild_id)
         if not settings:
             return False
 
-        now = datetime.now(timezone.utc).timestamp()
-        key = f"security:joins:{guild_id}"
         window = int(settings["join_burst_window_seconds"])
         threshold = int(settings["join_burst_count"])
 
-        redis = self.cache.require_client()
-        pipe = redis.pipeline()
-        pipe.zadd(key, {str(now): now})
-        pipe.zremrangebyscore(key, 0, now - window)
-        pipe.zcard(key)
-        pipe.expire(key, max(window, 60))
-        _, _, count, _ = await pipe.execute()
-
-        return int(count) >= threshold
+        count = await self._hit_sliding_window(f"security:joins:{guild_id}", window)
+        return count >= threshold
 
     async def enforce_account_age(self, member: discord.Member) -> bool:
         settings = await self.get_guild_settings(member.guild.id)
@@ -89,7 +313,7 @@ class SecurityService:
             return False
         min_age_hours = settings["min_account_age_hours"]
         auto_kick = settings["auto_kick_young_accounts"]
-        age_hours = (datetime.now(timezone.utc) - member.created_at).total_seconds() / 3600
+        age_hours = (time.time() - member.created_at.timestamp()) / 3600
 
         if age_hours >= min_age_hours:
             return False
@@ -106,22 +330,34 @@ class SecurityService:
         if auto_kick:
             try:
                 await member.kick(reason="Account too new during security policy enforcement")
-                await self.log_incident(
-                    member.guild.id,
+                await self.notify(
+                    member.guild,
                     "young_account_kicked",
                     "high",
                     f"Auto-kicked user {member.id} for young account",
-                    actor_id=member.id,
-                )
-                await self.post_security_log(
-                    member.guild,
                     f"[SECURITY] Auto-kicked <@{member.id}> for account age below threshold.",
+                    actor_id=member.id,
+                    settings=settings,
                 )
                 return True
             except discord.Forbidden:
                 log.warning("Missing permission to kick member=%s", member.id)
         return False
 
+    def _quarantine_role(self, guild: discord.Guild, role_name: str) -> discord.Role | None:
+        role_id = self._quarantine_roles.get(guild.id)
+        role = guild.get_role(role_id) if role_id is not None else None
+        if role is None or role.name != role_name:
+            role = discord.utils.get(guild.roles, name=role_name)
+            if role is None:
+                self._quarantine_roles.pop(guild.id, None)
+                return None
+            self._quarantine_roles[guild.id] = role.id
+        return role
+
+    def invalidate_quarantine_role(self, guild_id: int) -> None:
+        self._quarantine_roles.pop(guild_id, None)
+
     async def apply_quarantine_if_lockdown(self, member: discord.Member) -> None:
         if not await self.is_lockdown(member.guild.id):
             return
@@ -129,7 +365,7 @@ class SecurityService:
         if not settings:
             return
         role_name = settings["quarantine_role_name"] or self.settings.default_quarantine_role_name
-        role = discord.utils.get(member.guild.roles, name=role_name)
+        role = self._quarantine_role(member.guild, role_name)
         if role:
             try:
                 await member.add_roles(role, reason="Lockdown quarantine")
@@ -139,7 +375,8 @@ class SecurityService:
     async def handle_link_spam(self, message: discord.Message) -> None:
         if not message.guild or message.author.bot:
             return
-        if not LINK_RE.search(message.content):
+        content = message.content.lower()
+        if not any(marker in content for marker in LINK_MARKERS):
             return
 
         settings = await self.get_guild_settings(message.guild.id)
@@ -149,18 +386,8 @@ class SecurityService:
         window = int(settings["link_spam_window_seconds"])
         threshold = int(settings["link_spam_threshold"])
 
-        key = f"security:links:{message.guild.id}:{message.author.id}"
-        now = datetime.now(timezone.utc).timestamp()
-
-        redis = self.cache.require_client()
-        pipe = redis.pipeline()
-        pipe.zadd(key, {str(now): now})
-        pipe.zremrangebyscore(key, 0, now - window)
-        pipe.zcard(key)
-        pipe.expire(key, max(window, 60))
-        _, _, count, _ = await pipe.execute()
-
-        if int(count) < threshold:
+        count = await self._hit_sliding_window(f"security:links:{message.guild.id}:{message.author.id}", window)
+        if count < threshold:
             return
 
         if isinstance(message.author, discord.Member):
@@ -170,17 +397,15 @@ class SecurityService:
                     timed_out_until=timeout_until,
                     reason="Repeated link spam detected",
                 )
-                await self.log_incident(
-                    message.guild.id,
+                await self.notify(
+                    message.guild,
                     "link_spam_timeout",
                     "high",
                     f"Timed out user {message.author.id} after repeated links",
-                    actor_id=message.author.id,
-                    metadata={"message_id": message.id, "count": int(count)},
-                )
-                await self.post_security_log(
-                    message.guild,
                     f"[SECURITY] Timed out <@{message.author.id}> for repeated link spam.",
+                    actor_id=message.author.id,
+                    metadata={"message_id": message.id, "count": count},
+                    settings=settings,
                 )
             except discord.Forbidden:
                 log.warning("Unable to timeout user=%s", message.author.id)
@@ -191,82 +416,137 @@ class SecurityService:
             guild_id,
             channel_id,
         )
+        await self.invalidate_guild_settings(guild_id)
 
     async def set_lockdown(self, guild: discord.Guild, enabled: bool) -> None:
-        await self.pool.execute(
-            "UPDATE guilds SET lockdown_enabled = $2, updated_at = NOW() WHERE guild_id = $1",
+        # RETURNING hands back the settings the lockdown controls and log post
+        # need, so nothing is re-read after the cache is invalidated.
+        row = await self.pool.fetchrow(
+            """
+            WITH updated AS (
+                UPDATE guilds
+                SET lockdown_enabled = $2, updated_at = NOW()
+                WHERE guild_id = $1
+                RETURNING guild_id, lockdown_slowmode_seconds, security_log_channel_id
+            )
+            SELECT lockdown_slowmode_seconds,
+                   security_log_channel_id,
+                   pg_notify($3, guild_id::text || ':' || $4) AS notified
+            FROM updated
+            """,
             guild.id,
             enabled,
+            LOCKDOWN_CHANNEL,
+            "on" if enabled else "off",
         )
+        if enabled:
+            self._lockdown_guilds.add(guild.id)
+        else:
+            self._lockdown_guilds.discard(guild.id)
+        await self.invalidate_guild_settings(guild.id)
+        settings = dict(row) if row else None
 
         if enabled:
-            await self._enable_lockdown_controls(guild)
-            await self.log_incident(guild.id, "lockdown_enabled", "critical", "Lockdown enabled")
-            await self.post_security_log(guild, "[SECURITY] Lockdown enabled.")
+            if settings:
+                await self._enable_lockdown_controls(guild, int(settings["lockdown_slowmode_seconds"]))
+            await self.notify(
+                guild,
+                "lockdown_enabled",
+                "critical",
+                "Lockdown enabled",
+                "[SECURITY] Lockdown enabled.",
+                settings=settings,
+            )
         else:
             await self._disable_lockdown_controls(guild)
-            await self.log_incident(guild.id, "lockdown_disabled", "medium", "Lockdown disabled")
-            await self.post_security_log(guild, "[SECURITY] Lockdown disabled.")
-
-    async def _enable_lockdown_controls(self, guild: discord.Guild) -> None:
-        settings = await self.get_guild_settings(guild.id)
-        if not settings:
-            return
-
-        slowmode = int(settings["lockdown_slowmode_seconds"])
-        redis = self.cache.require_client()
-        previous_slowmodes: dict[str, int] = {}
+            await self.notify(
+                guild,
+                "lockdown_disabled",
+                "medium",
+                "Lockdown disabled",
+                "[SECURITY] Lockdown disabled.",
+                settings=settings,
+            )
+
+    @staticmethod
+    async def _set_slowmode(
+        channel: discord.TextChannel, delay: int, reason: str, sem: asyncio.Semaphore
+    ) -> None:
+        async with sem:
+            try:
+                await channel.edit(slowmode_delay=delay, reason=reason)
+            except discord.HTTPException as exc:
+                log.warning("Cannot set slowmode for channel=%s: %s", channel.id, exc)
 
-        for channel in guild.text_channels:
-            previous_slowmodes[str(channel.id)] = channel.slowmode_delay
+    @staticmethod
+    async def _delete_invite(invite: discord.Invite, guild_id: int, sem: asyncio.Semaphore) -> None:
+        async with sem:
             try:
-                await channel.edit(slowmode_delay=slowmode, reason="Security lockdown enabled")
-            except discord.Forbidden:
-                log.warning("Cannot set slowmode for channel=%s", channel.id)
+                await invite.delete(reason="Security lockdown enabled")
+            except discord.HTTPException as exc:
+                log.warning("Cannot delete invite=%s in guild=%s: %s", invite.code, guild_id, exc)
+
+    @staticmethod
+    async def _gather_edits(guild_id: int, edits: list[Awaitable[None]]) -> None:
+        # One failed edit must not abort the rest of the lockdown or orphan its siblings.
+        results = await asyncio.gather(*edits, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                log.error("Lockdown edit failed in guild=%s", guild_id, exc_info=result)
+
+    async def _enable_lockdown_controls(self, guild: discord.Guild, slowmode: int) -> None:
+        channels = guild.text_channels
+        previous_slowmodes = {str(channel.id): channel.slowmode_delay for channel in channels}
+        await self.cache.replace_hashes(
+            {slowmode_backup_key(guild.id): previous_slowmodes}, ex=SLOWMODE_BACKUP_TTL_SECONDS
+        )
 
-        await self.cache.set_json(f"security:slowmode_backup:{guild.id}", previous_slowmodes, ex=86400)
+        sem = asyncio.Semaphore(LOCKDOWN_EDIT_CONCURRENCY)
+        reason = "Security lockdown enabled"
+        await self._gather_edits(guild.id, [self._set_slowmode(ch, slowmode, reason, sem) for ch in channels])
 
         try:
             invites = await guild.invites()
-            for inv in invites:
-                try:
-                    await inv.delete(reason="Security lockdown enabled")
-                except discord.Forbidden:
-                    log.warning("Cannot delete invite=%s in guild=%s", inv.code, guild.id)
-        except discord.Forbidden:
-            log.warning("Cannot list invites during lockdown for guild=%s", guild.id)
+        except discord.HTTPException as exc:
+            log.warning("Cannot list invites during lockdown for guild=%s: %s", guild.id, exc)
+            return
+        await self._gather_edits(guild.id, [self._delete_invite(inv, guild.id, sem) for inv in invites])
 
     async def _disable_lockdown_controls(self, guild: discord.Guild) -> None:
-        backup = await self.cache.get_json(f"security:slowmode_backup:{guild.id}") or {}
-        for channel in guild.text_channels:
-            desired = int(backup.get(str(channel.id), 0))
-            if channel.slowmode_delay == desired:
-                continue
-            try:
-                await channel.edit(slowmode_delay=desired, reason="Security lockdown disabled")
-            except discord.Forbidden:
-                log.warning("Cannot restore slowmode for channel=%s", channel.id)
+        channels = guild.text_channels
+        backup = await self.cache.hmget(slowmode_backup_key(guild.id), [str(channel.id) for channel in channels])
+        sem = asyncio.Semaphore(LOCKDOWN_EDIT_CONCURRENCY)
+        restores = []
+        for channel, previous in zip(channels, backup):
+            desired = int(previous) if previous is not None else 0
+            if channel.slowmode_delay != desired:
+                restores.append(self._set_slowmode(channel, desired, "Security lockdown disabled", sem))
+        await self._gather_edits(guild.id, restores)
 
     async def advanced_raid_prediction(self, guild_id: int) -> dict:
-        await assert_premium(self.pool, guild_id)
-        incidents = await self.pool.fetch(
+        await assert_premium(self.pool, guild_id, self.cache)
+        row = await self.pool.fetchrow(
             """
-            SELECT severity, created_at
-            FROM incidents
-            WHERE guild_id = $1
-              AND created_at > NOW() - INTERVAL '1 hour'
+            SELECT COALESCE(SUM(COALESCE(w.weight, 1)), 0) AS score, COUNT(*) AS incidents
+            FROM incidents i
+            LEFT JOIN unnest($2::text[], $3::int[]) AS w(severity, weight) ON w.severity = i.severity
+            WHERE i.guild_id = $1
+              AND i.created_at > NOW() - INTERVAL '1 hour'
             """,
             guild_id,
+            SEVERITY_NAMES,
+            SEVERITY_WEIGHT_VALUES,
         )
-        weight = {"low": 1, "medium": 2, "high": 4, "critical": 7}
-        score = sum(weight.get(r["severity"], 1) for r in incidents)
+        score = int(row["score"])
         prediction = "high" if score >= 20 else "medium" if score >= 10 else "low"
-        return {"risk": prediction, "score": score, "incidents_last_hour": len(incidents)}
+        return {"risk": prediction, "score": score, "incidents_last_hour": row["incidents"]}
 
     async def check_cross_server_blacklist(self, member: discord.Member) -> bool:
-        try:
-            await assert_premium(self.pool, member.guild.id)
-        except PremiumRequiredError:
+        # The premium flag comes from the in-process settings cache, so
+        # non-premium guilds skip the database entirely. Premium activation
+        # calls invalidate_guild_settings, so the flag is not stale here.
+        settings = await self.get_guild_settings(member.guild.id)
+        if not settings or not settings["is_premium"]:
             return False
 
         row = await self.pool.fetchrow(
@@ -282,31 +562,32 @@ class SecurityService:
         if not row:
             return False
 
-        await self.log_incident(
-            member.guild.id,
+        await self.notify(
+            member.guild,
             "cross_server_blacklist_hit",
             "critical",
             f"Member {member.id} matched cross-server blacklist",
-            actor_id=member.id,
-        )
-        await self.post_security_log(
-            member.guild,
             f"[SECURITY] Blacklist match for <@{member.id}>. Review recommended.",
+            actor_id=member.id,
+            settings=settings,
         )
         return True
 
-    async def invite_fraud_scoring(self, guild_id: int) -> list[asyncpg.Record]:
-        await assert_premium(self.pool, guild_id)
-        return await self.pool.fetch(
+    async def invite_fraud_scoring(self, guild_id: int) -> str:
+        await assert_premium(self.pool, guild_id, self.cache)
+        return await self.pool.fetchval(
             """
-            SELECT member_id,
-                   AVG(score) AS avg_score,
-                   COUNT(*) AS flags
-            FROM fraud_flags
-            WHERE guild_id = $1
-            GROUP BY member_id
-            ORDER BY avg_score DESC, flags DESC
-            LIMIT 50
+            SELECT COALESCE(json_agg(t), '[]'::json)
+            FROM (
+                SELECT member_id,
+                       AVG(score) AS avg_score,
+                       COUNT(*) AS flags
+                FROM fraud_flags
+                WHERE guild_id = $1
+                GROUP BY member_id
+                ORDER BY avg_score DESC, flags DESC
+                LIMIT 50
+            ) t
             """,
             guild_id,
         )
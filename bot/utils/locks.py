@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 import asyncio
-from collections import defaultdict
+from weakref import WeakValueDictionary
 
 
 class GuildLockManager:
     def __init__(self) -> None:
-        self._locks: defaultdict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # Locks are dropped once no caller holds or awaits them, so idle guilds cost nothing.
+        self._locks: WeakValueDictionary[int, asyncio.Lock] = WeakValueDictionary()
 
     def get(self, guild_id: int) -> asyncio.Lock:
-        return self._locks[guild_id]
+        lock = self._locks.get(guild_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[guild_id] = lock
+        return lock
@@ -2,21 +2,37 @@ from __future__ import annotations
 
 import asyncpg
 
+from bot.cache import RedisCache
+
+PREMIUM_CACHE_TTL_SECONDS = 60
+
 
 class PremiumRequiredError(PermissionError):
     """Raised when a premium-gated feature is used in a non-premium guild."""
 
 
-async def assert_premium(pool: asyncpg.Pool, guild_id: int) -> None:
-    row = await pool.fetchrow(
-        """
-        SELECT is_premium, premium_until
-        FROM guilds
-        WHERE guild_id = $1
-        """,
-        guild_id,
-    )
-    if not row:
-        raise PremiumRequiredError("Guild has no settings record")
-    if not row["is_premium"]:
+
+def premium_cache_key(guild_id: int) -> str:
+    return f"premium:{guild_id}"
+
+
+
+async def assert_premium(pool: asyncpg.Pool, guild_id: int, cache: RedisCache | None = None) -> None:
+    key = premium_cache_key(guild_id)
+    cached = await cache.get_json(key) if cache else None
+    if cached is None:
+        row = await pool.fetchrow(
+            """
+            SELECT is_premium, premium_until
+            FROM guilds
+            WHERE guild_id = $1
+            """,
+            guild_id,
+        )
+        if not row:
+            raise PremiumRequiredError("Guild has no settings record")
+        cached = {"is_premium": bool(row["is_premium"])}
+        if cache:
+            await cache.set_json(key, cached, ex=PREMIUM_CACHE_TTL_SECONDS)
+    if not cached["is_premium"]:
         raise PremiumRequiredError("This feature requires premium")
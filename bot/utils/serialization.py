@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ships wheels for all supported platforms
+    orjson = None
+    import json
+
+
+if orjson is not None:
+
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_NAIVE_UTC)
+
+    def loads(raw: bytes | str) -> Any:
+        return orjson.loads(raw)
+
+else:
+
+    def _default(value: Any) -> Any:
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, default=_default, separators=(",", ":")).encode("utf-8")
+
+    def loads(raw: bytes | str) -> Any:
+        return json.loads(raw)
@@ -3,17 +3,21 @@ from __future__ import annotations
 import asyncio
 import logging
 
+import aiohttp
 import uvicorn
 from dotenv import load_dotenv
 
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - uvloop does not support Windows
+    uvloop = None
+
 from api.app import create_api
 from bot.cache import RedisCache
 from bot.config import load_settings
 from bot.db import Database
 from bot.logging import configure_logging
 from bot.main import create_bot
-from bot.services.analytics import AnalyticsService
-from bot.services.security import SecurityService
 
 
 async def main() -> None:
@@ -22,19 +26,32 @@ async def main() -> None:
     configure_logging(settings.log_level)
     log = logging.getLogger("runner")
 
-    db = Database(settings.postgres_dsn)
+    db = Database(
+        settings.postgres_dsn,
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+        max_queries=settings.db_pool_max_queries,
+        max_inactive_connection_lifetime=settings.db_pool_max_inactive_lifetime_seconds,
+    )
     cache = RedisCache(settings.redis_url)
 
     await db.connect()
     await cache.connect()
     pool = db.require_pool()
 
-    bot = await create_bot(settings, pool, cache)
-    analytics = AnalyticsService(pool)
-    security = SecurityService(pool, cache, settings)
-    api = create_api(analytics, security)
+    # Keep-alive HTTP connections to Discord's REST API, reused across bursts of
+    # lockdown edits and invite listings.
+    connector = aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=75)
+    bot = await create_bot(settings, pool, cache, connector)
+    api = create_api(bot.analytics, bot.security, cache)
 
-    config = uvicorn.Config(api, host=settings.api_host, port=settings.api_port, log_level=settings.log_level.lower())
+    config = uvicorn.Config(
+        api,
+        host=settings.api_host,
+        port=settings.api_port,
+        log_level=settings.log_level.lower(),
+        http="httptools",
+    )
     server = uvicorn.Server(config)
 
     async def run_api() -> None:
@@ -55,10 +72,13 @@ async def main() -> None:
             task.cancel()
     finally:
         await bot.close()
+        await connector.close()
         await cache.close()
         await db.close()
         log.info("Shutdown complete")
 
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())
@@ -0,0 +1,8 @@
+-- Adds the stored net_invites column and its leaderboard indexes to databases
+-- created before it was part of sql/schema.sql. Safe to run more than once.
+ALTER TABLE user_invite_stats
+    ADD COLUMN IF NOT EXISTS net_invites INT
+    GENERATED ALWAYS AS (real_invites + bonus_invites - fake_invites - leaves) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_user_invite_stats_net ON user_invite_stats(net_invites DESC, total_invites DESC);
+CREATE INDEX IF NOT EXISTS idx_user_invite_stats_guild_net ON user_invite_stats(guild_id, net_invites DESC, total_invites DESC);
@@ -0,0 +1,4 @@
+-- Adds the (guild_id, member_id, joined_at) index used by the leave handler's
+-- last-join lookup to databases created before it was part of sql/schema.sql.
+-- Safe to run more than once.
+CREATE INDEX IF NOT EXISTS idx_invite_joins_guild_member ON invite_joins(guild_id, member_id, joined_at DESC);
@@ -112,6 +112,7 @@ CREATE TABLE IF NOT EXISTS user_invite_stats (
     leaves INT NOT NULL DEFAULT 0,
     rejoins INT NOT NULL DEFAULT 0,
     bonus_invites INT NOT NULL DEFAULT 0,
+    net_invites INT GENERATED ALWAYS AS (real_invites + bonus_invites - fake_invites - leaves) STORED,
     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     PRIMARY KEY (guild_id, user_id)
 );
@@ -122,8 +123,11 @@ ALTER TABLE guilds
 
 CREATE INDEX IF NOT EXISTS idx_invite_joins_guild_joined_at ON invite_joins(guild_id, joined_at DESC);
 CREATE INDEX IF NOT EXISTS idx_invite_joins_inviter ON invite_joins(guild_id, inviter_id);
+CREATE INDEX IF NOT EXISTS idx_invite_joins_guild_member ON invite_joins(guild_id, member_id, joined_at DESC);
 CREATE INDEX IF NOT EXISTS idx_invite_leaves_guild_left_at ON invite_leaves(guild_id, left_at DESC);
 CREATE INDEX IF NOT EXISTS idx_incidents_guild_created ON incidents(guild_id, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_fraud_flags_guild_created ON fraud_flags(guild_id, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_fraud_flags_member ON fraud_flags(member_id);
 CREATE INDEX IF NOT EXISTS idx_invites_guild_uses ON invites(guild_id, uses DESC);
+CREATE INDEX IF NOT EXISTS idx_user_invite_stats_net ON user_invite_stats(net_invites DESC, total_invites DESC);
+CREATE INDEX IF NOT EXISTS idx_user_invite_stats_guild_net ON user_invite_stats(guild_id, net_invites DESC, total_invites DESC);